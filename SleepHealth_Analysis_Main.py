@@ -1,11 +1,16 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context
-import plotly.express as px
+from dash import dcc, html, Input, Output, State, Patch, callback_context
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 import numpy as np
 from flask import Flask
+from flask.json.provider import JSONProvider
+import orjson
 import os
+import itertools
+import functools
+from types import SimpleNamespace
 
 # ============================================================================
 # DATA PREPARATION
@@ -18,34 +23,243 @@ if not os.path.exists(data_path):
     # If not in current directory, check if it's in a data folder
     data_path = os.path.join("data", "sleep_health_cleaned_for_dashboard.csv")
 
+# Only the columns the dashboard actually uses, with explicit narrow dtypes
+# so the parser skips type inference and every later pass touches fewer
+# bytes (blood pressure columns are never shown); low-cardinality text
+# columns are parsed straight to categoricals (small integer codes).
+# sleep_duration is left to parse as float64: its averages are shown to one
+# decimal, and float32 values shift some of them across a rounding or
+# threshold boundary
+CSV_COLUMNS = [
+    'gender', 'age', 'occupation', 'sleep_duration', 'quality_of_sleep',
+    'physical_activity_level', 'stress_level', 'bmi_category', 'heart_rate',
+    'daily_steps', 'sleep_disorder'
+]
+CSV_DTYPES = {
+    'age': 'int16',
+    'quality_of_sleep': 'int8',
+    'physical_activity_level': 'int8',
+    'stress_level': 'int8',
+    'heart_rate': 'int16',
+    'daily_steps': 'int32',
+    'gender': 'category',
+    'occupation': 'category',
+    'sleep_disorder': 'category',
+    'bmi_category': 'category',
+}
+
 try:
-    df = pd.read_csv(data_path)
+    df = pd.read_csv(data_path, usecols=CSV_COLUMNS, dtype=CSV_DTYPES)
 except FileNotFoundError:
     # Create dummy data if file not found (for testing purposes)
     print("Warning: Data file not found. Creating sample data for testing.")
     # Generate sample data with relevant columns
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_samples = 200
     
+    genders = ['Male', 'Female']
     occupations = ['Software Engineer', 'Doctor', 'Nurse', 'Teacher', 'Accountant', 'Lawyer', 'Sales Representative']
+    disorders = ['None', 'Insomnia', 'Sleep Apnea']
+    bmi_categories = ['Underweight', 'Normal', 'Overweight', 'Obese']
     
-    df = pd.DataFrame({
-        'age': np.random.randint(18, 70, n_samples),
-        'gender': np.random.choice(['Male', 'Female'], n_samples),
-        'occupation': np.random.choice(occupations, n_samples),
-        'sleep_duration': np.random.normal(7, 1.5, n_samples).clip(4, 10),
-        'quality_of_sleep': np.random.randint(1, 11, n_samples),
-        'stress_level': np.random.randint(1, 11, n_samples),
-        'physical_activity_level': np.random.randint(10, 100, n_samples),
-        'heart_rate': np.random.normal(70, 8, n_samples).clip(50, 95).astype(int),
-        'daily_steps': np.random.randint(2000, 15000, n_samples),
-        'sleep_disorder': np.random.choice(['None', 'Insomnia', 'Sleep Apnea'], n_samples, p=[0.7, 0.2, 0.1]),
-        'bmi_category': np.random.choice(['Underweight', 'Normal', 'Overweight', 'Obese'], n_samples, p=[0.2, 0.5, 0.2, 0.1])
-    })
+    # One pre-typed buffer for every column; text columns hold category codes
+    sample = np.empty(n_samples, dtype=[
+        ('age', 'i2'), ('gender', 'i1'), ('occupation', 'i1'), ('sleep_duration', 'f8'),
+        ('quality_of_sleep', 'i1'), ('stress_level', 'i1'), ('physical_activity_level', 'i1'),
+        ('heart_rate', 'i2'), ('daily_steps', 'i4'), ('sleep_disorder', 'i1'), ('bmi_category', 'i1')
+    ])
+    sample['age'] = rng.integers(18, 70, n_samples)
+    sample['gender'] = rng.integers(0, len(genders), n_samples)
+    sample['occupation'] = rng.integers(0, len(occupations), n_samples)
+    sample['sleep_duration'] = rng.normal(7, 1.5, n_samples).clip(4, 10)
+    sample['quality_of_sleep'] = rng.integers(1, 11, n_samples)
+    sample['stress_level'] = rng.integers(1, 11, n_samples)
+    sample['physical_activity_level'] = rng.integers(10, 100, n_samples)
+    sample['heart_rate'] = rng.normal(70, 8, n_samples).clip(50, 95)
+    sample['daily_steps'] = rng.integers(2000, 15000, n_samples)
+    sample['sleep_disorder'] = rng.choice(len(disorders), n_samples, p=[0.7, 0.2, 0.1])
+    sample['bmi_category'] = rng.choice(len(bmi_categories), n_samples, p=[0.2, 0.5, 0.2, 0.1])
+    
+    df = pd.DataFrame(sample)
+    for col, categories in (('gender', genders), ('occupation', occupations),
+                            ('sleep_disorder', disorders), ('bmi_category', bmi_categories)):
+        df[col] = pd.Categorical.from_codes(df[col], categories=categories)
+
+# Relabel BMI categories once, as they are charted on the BMI tab ("Normal"
+# shows as Underweight and "Normal Weight" as Normal), in chart order
+BMI_ORDER = ["Obese", "Overweight", "Normal", "Underweight"]
+_bmi_display = [{'Normal': 'Underweight', 'Normal Weight': 'Normal'}.get(c, c) for c in df['bmi_category'].cat.categories]
+_bmi_cats = [c for c in dict.fromkeys(BMI_ORDER + _bmi_display) if c in _bmi_display]
+_bmi_remap = np.array([_bmi_cats.index(c) for c in _bmi_display] + [-1], dtype=np.int8)
+df['bmi_category'] = pd.Categorical.from_codes(_bmi_remap[df['bmi_category'].cat.codes.to_numpy()], _bmi_cats)
 
 # Create age groups for filtering
-df['age_group'] = pd.cut(df['age'], bins=[0, 30, 40, 50, 60, 100], 
-                         labels=['Under 30', '30-40', '40-50', '50-60', 'Over 60'])
+# Same right-closed bins as pd.cut, but bucketed straight to int8 codes with
+# one searchsorted over the integer ages (no float intermediate)
+AGE_BINS = np.array([0, 30, 40, 50, 60, 100])
+AGE_GROUPS = ['Under 30', '30-40', '40-50', '50-60', 'Over 60']
+
+age_codes = np.searchsorted(AGE_BINS, df['age'].to_numpy(), side='left').astype(np.int8) - 1
+age_codes[age_codes >= len(AGE_GROUPS)] = -1
+df['age_group'] = pd.Categorical.from_codes(age_codes, categories=AGE_GROUPS, ordered=True)
+
+# Plain numpy arrays for filtering and aggregation: value columns plus the
+# category codes and labels of every categorical, so the hot paths never go
+# through pandas indexing
+DATA = SimpleNamespace(
+    **{col: df[col].to_numpy() for col in (
+        'age', 'sleep_duration', 'quality_of_sleep', 'stress_level',
+        'physical_activity_level', 'heart_rate', 'daily_steps'
+    )},
+    **{f"{col}_code": df[col].cat.codes.to_numpy() for col in (
+        'gender', 'age_group', 'occupation', 'sleep_disorder', 'bmi_category'
+    )},
+    **{f"{col}_cats": tuple(df[col].cat.categories) for col in (
+        'gender', 'age_group', 'occupation', 'sleep_disorder', 'bmi_category'
+    )},
+)
+
+# Filter dropdown options, built once from the category label tuples
+GENDER_OPTS = [{"label": "All Genders", "value": "All"}] + \
+              [{"label": g, "value": g} for g in DATA.gender_cats]
+AGE_OPTS = [{"label": "All Ages", "value": "All"}] + \
+           [{"label": g, "value": g} for g in DATA.age_group_cats]
+OCCUPATION_OPTS = [{"label": "All Occupations", "value": "All"}] + \
+                  [{"label": o, "value": o} for o in DATA.occupation_cats]
+DISORDER_OPTS = [{"label": "All", "value": "All"}] + \
+                [{"label": s, "value": s} for s in DATA.sleep_disorder_cats]
+
+# Precompute a row mask for every filter combination ("All" acts as a
+# wildcard) so callbacks do a dict lookup instead of re-comparing columns
+FILTER_COLUMNS = ('gender', 'age_group', 'occupation', 'sleep_disorder')
+
+def _value_masks(col):
+    codes = getattr(DATA, f"{col}_code")
+    masks = {"All": np.packbits(np.ones(codes.size, dtype=bool))}
+    for code, value in enumerate(getattr(DATA, f"{col}_cats")):
+        masks[value] = np.packbits(codes == code)
+    return masks
+
+_gender_masks, _age_masks, _occupation_masks, _disorder_masks = (
+    _value_masks(col) for col in FILTER_COLUMNS
+)
+# Masks are bit-packed (one bit per row, 8x smaller than a bool mask) and
+# combined in packed form, level by level, so each gender/age and occupation
+# prefix is computed once and reused rather than re-and-ing all four per key
+FILTER_MASKS = {}
+for (g, gender_mask), (a, age_mask) in itertools.product(_gender_masks.items(), _age_masks.items()):
+    ga_mask = gender_mask & age_mask
+    for o, occupation_mask in _occupation_masks.items():
+        gao_mask = ga_mask & occupation_mask
+        for d, disorder_mask in _disorder_masks.items():
+            FILTER_MASKS[(g, a, o, d)] = gao_mask & disorder_mask
+_NO_ROWS = np.packbits(np.zeros(DATA.age.size, dtype=bool))
+
+def _unpack_mask(packed):
+    return np.unpackbits(packed, count=DATA.age.size)
+
+# Row positions for a filter selection, memoized per worker so repeated
+# selections (theme or tab changes) skip the mask-to-index conversion
+@functools.lru_cache(maxsize=1024)
+def get_filtered_indices(gender, age_group, occupation, disorder):
+    # Unknown values (e.g. a cleared dropdown) match no rows, as before
+    mask = FILTER_MASKS.get((gender, age_group, occupation, disorder), _NO_ROWS)
+    indices = np.flatnonzero(_unpack_mask(mask)).astype(np.int32)
+    indices.flags.writeable = False
+    return indices
+
+# Warm the cache at startup for the default selection every page load starts
+# with and for each gender on its own, the most common first interaction
+for g in _gender_masks:
+    get_filtered_indices(g, "All", "All", "All")
+
+# Scalar summaries of every filter selection, computed once at startup from
+# the numpy arrays and shared by the summary cards and the insights panel
+_NO_DISORDER_CODE = DATA.sleep_disorder_cats.index('None') if 'None' in DATA.sleep_disorder_cats else -1
+
+# One column per stat: the averaged values and the 0/1 indicators behind the
+# insight percentages, computed once for every record. Each is averaged over
+# a selection's rows in file order, as Series.mean() adds them up, so means
+# on a .x5 boundary round the way they always have
+STAT_NAMES = ('avg_sleep', 'avg_quality', 'avg_stress', 'avg_activity',
+              'sleep_disorders_pct', 'high_stress_pct', 'low_activity_pct')
+STAT_COLUMNS = (
+    DATA.sleep_duration,
+    DATA.quality_of_sleep,
+    DATA.stress_level,
+    DATA.physical_activity_level,
+    DATA.sleep_disorder_code != _NO_DISORDER_CODE,
+    DATA.stress_level > 7,
+    DATA.physical_activity_level < 50,
+)
+STAT_SCALES = (1, 1, 1, 1, 100, 100, 100)
+
+def _selection_stats(rows):
+    if rows.size == 0:
+        return SimpleNamespace(**dict.fromkeys(STAT_NAMES, np.nan))
+    return SimpleNamespace(**{
+        name: column[rows].mean(dtype=np.float64) * scale
+        for name, column, scale in zip(STAT_NAMES, STAT_COLUMNS, STAT_SCALES)
+    })
+
+SELECTION_STATS = {key: _selection_stats(np.flatnonzero(_unpack_mask(mask))) for key, mask in FILTER_MASKS.items()}
+_NO_STATS = _selection_stats(np.flatnonzero(_unpack_mask(_NO_ROWS)))
+
+def get_selection_stats(gender, age_group, occupation, disorder):
+    return SELECTION_STATS.get((gender, age_group, occupation, disorder), _NO_STATS)
+
+# Rows sorted once by occupation code, with the start offset of each
+# occupation, so per-occupation sums are a single np.add.reduceat
+OCCUPATION_ORDER = np.argsort(DATA.occupation_code, kind='stable')
+_sorted_codes = DATA.occupation_code[OCCUPATION_ORDER]
+OCCUPATION_STARTS = np.flatnonzero(np.r_[True, np.diff(_sorted_codes) != 0])
+OCCUPATION_LABELS = np.asarray(DATA.occupation_cats)[_sorted_codes[OCCUPATION_STARTS]]
+OCCUPATION_SORTED = {
+    col: getattr(DATA, col)[OCCUPATION_ORDER].astype(np.float64)
+    for col in ('quality_of_sleep', 'stress_level', 'sleep_duration')
+}
+
+# Formatted summary-card values for every selection, keyed by the filter
+# values joined with "|", so the browser can fill in the cards by lookup
+def _summary_values(stats):
+    return [f"{stats.avg_sleep:.1f} hrs", f"{stats.avg_quality:.1f}/10",
+            f"{stats.avg_stress:.1f}/10", f"{stats.avg_activity:.0f}/100"]
+
+SUMMARY_VALUES = {
+    'by_filters': {"|".join(key): _summary_values(stats) for key, stats in SELECTION_STATS.items()},
+    'no_rows': _summary_values(_NO_STATS),
+}
+
+# Box statistics of sleep duration per BMI category for a filter selection,
+# memoized per filter key so the BMI box plot ships five numbers and its
+# outliers per box rather than every row. Quartiles use plotly's default
+# "linear" method (numpy's hazen) and whiskers stop at the furthest point
+# within 1.5 IQR, as plotly.js computes them from raw points
+@functools.lru_cache(maxsize=1024)
+def get_bmi_box_stats(gender, age_group, occupation, disorder):
+    selected_rows = get_filtered_indices(gender, age_group, occupation, disorder)
+    codes = DATA.bmi_category_code[selected_rows]
+    durations = DATA.sleep_duration[selected_rows]
+    
+    boxes = {}
+    for code, label in enumerate(DATA.bmi_category_cats):
+        values = np.sort(durations[codes == code])
+        if not values.size:
+            continue
+        q1, median, q3 = np.percentile(values, [25, 50, 75], method='hazen')
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        lowerfence = min(q1, values[min(np.searchsorted(values, low), values.size - 1)])
+        upperfence = max(q3, values[max(np.searchsorted(values, high, side='right') - 1, 0)])
+        boxes[label] = SimpleNamespace(
+            q1=q1, median=median, q3=q3, lowerfence=lowerfence, upperfence=upperfence,
+            outliers=values[(values < lowerfence) | (values > upperfence)]
+        )
+    return boxes
+
+# Compute the boxes at startup for the same selections whose row indices are
+# warmed: the default one and each gender on its own
+for g in _gender_masks:
+    get_bmi_box_stats(g, "All", "All", "All")
 
 # Define color themes
 light_theme = {
@@ -74,20 +288,224 @@ dark_theme = {
     'chart_colors': ["#56B4E9", "#009E73", "#D55E00", "#CC79A7", "#F0E442", "#0072B2"]
 }
 
-current_theme = light_theme
+# Template, background and font shared by every figure layout, per theme
+LAYOUT_STYLES = {
+    key: dict(
+        template=template,
+        plot_bgcolor=theme_colors["card"],
+        paper_bgcolor=theme_colors["card"],
+        font=dict(color=theme_colors["text"]),
+    )
+    for key, theme_colors, template in (('light', light_theme, "plotly_white"), ('dark', dark_theme, "plotly_dark"))
+}
+
+# Filter-independent layout of the sleep pattern figures, built once per
+# theme so the callback only has to supply the traces
+def _sleep_pattern_layout(theme_key, title, **axis_titles):
+    return go.Layout(
+        title=title,
+        **axis_titles,
+        **LAYOUT_STYLES[theme_key],
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=350
+    )
+
+# The histogram layout carries the recommended-sleep reference zone too.
+# Reference shapes and labels are passed to the Layout constructor as plain
+# dicts (what add_vrect/add_hrect/add_vline would add), validated in one pass
+def _histogram_layout(theme_key):
+    theme_colors = dark_theme if theme_key == 'dark' else light_theme
+    return _sleep_pattern_layout(
+        theme_key, "Sleep Duration Distribution",
+        xaxis_title='Sleep Duration (hours)', yaxis_title='count',
+        # Reference zone for healthy sleep, labelled in its top right corner
+        shapes=[dict(type='rect', xref='x', yref='y domain', x0=7, x1=9, y0=0, y1=1,
+                     fillcolor=theme_colors["accent2"], opacity=0.15, layer='below', line_width=0)],
+        annotations=[dict(text="Recommended Sleep Range", showarrow=False, xref='x', yref='y domain',
+                          x=9, y=1, xanchor='right', yanchor='top')]
+    )
+
+HISTOGRAM_LAYOUTS = {key: _histogram_layout(key) for key in ('light', 'dark')}
+
+# Filter-independent layouts of the stress and activity scatters, with their
+# reference zone and line, built once per theme
+def _stress_layout(theme_key):
+    theme_colors = dark_theme if theme_key == 'dark' else light_theme
+    return go.Layout(
+        xaxis_title='Stress Level (1-10)',
+        yaxis_title='Sleep Duration (hours)',
+        coloraxis=dict(
+            colorscale=[theme_colors["accent4"], theme_colors["accent5"], theme_colors["accent2"]],
+            colorbar_title_text='Sleep Quality'
+        ),
+        # Stress level zone: the healthy sleep band across the full width
+        shapes=[dict(type='rect', xref='x domain', yref='y', x0=0, x1=1, y0=7, y1=9,
+                     fillcolor=theme_colors["accent2"], opacity=0.15, layer='below', line_width=0)],
+        margin=dict(t=60),
+        height=450,
+        **LAYOUT_STYLES[theme_key]
+    )
+
+def _activity_layout(theme_key):
+    theme_colors = dark_theme if theme_key == 'dark' else light_theme
+    return go.Layout(
+        xaxis_title='Daily Steps',
+        yaxis_title='Sleep Duration (hours)',
+        coloraxis=dict(
+            colorscale=[theme_colors["accent2"], theme_colors["accent5"], theme_colors["accent4"]],
+            colorbar_title_text='Heart Rate (bpm)'
+        ),
+        # Reference line for recommended steps, labelled at its top
+        shapes=[dict(type='line', xref='x', yref='y domain', x0=10000, x1=10000, y0=0, y1=1,
+                     line=dict(color=theme_colors["accent1"], width=2, dash='dash'))],
+        annotations=[dict(text="10,000 steps goal", showarrow=False, xref='x', yref='y domain',
+                          x=10000, y=1, xanchor='left', yanchor='top')],
+        legend_itemsizing='constant',
+        margin=dict(t=60),
+        height=450,
+        **LAYOUT_STYLES[theme_key]
+    )
+
+STRESS_LAYOUTS = {key: _stress_layout(key) for key in ('light', 'dark')}
+ACTIVITY_LAYOUTS = {key: _activity_layout(key) for key in ('light', 'dark')}
+SCATTER_LAYOUTS = {
+    key: _sleep_pattern_layout(key, "Sleep Quality vs. Duration",
+                               xaxis_title='Sleep Duration (hours)', yaxis_title='Sleep Quality (1-10)',
+                               legend=dict(title_text='gender', itemsizing='constant'))
+    for key in ('light', 'dark')
+}
+
+# Area-scaled marker sizeref as px computes it for a size_max of 20
+def _marker_sizeref(sizes, size_max=20):
+    return sizes.max() / size_max ** 2 if sizes.size else 1
+
+# Histogram bin counts as plotly.js autobins nbinsx bins, so bars can be sent
+# instead of the raw values. Mirrors Axes.autoBin in plotly.js
+# (src/plots/cartesian/axes.js, as bundled with plotly 5.18): a "nice" bin
+# size (2, 5 or 10 times a power of ten, as autoTicks rounds it), the first
+# edge one bin below the first tick, then autoShiftNumericBins moving the
+# edges off integer or edge-heavy data. Values are binned as Lib.findBin
+# does, including its 1e-9 allowance for values a rounding error below an edge
+def _histogram_bins(values, nbins=20):
+    if not values.size:
+        return values, np.zeros(0, dtype=np.int64), 1, []
+    lo, hi = values.min(), values.max()
+    rough = (hi - lo) / nbins
+    if rough > 0:
+        base = 10 ** np.floor(np.log10(rough))
+        size = base * next((step for step in (2, 5) if step > rough / base), 10)
+    else:
+        size = 1
+    start = np.ceil(lo / size) * size - size
+    
+    def near_edge(v):
+        return np.fmod(1 + (v - start) * 100 / size, 100) < 2
+    if np.all(values % 1 == 0):
+        if size < 1:
+            start = lo - 0.5 * size
+        else:
+            start -= 0.5
+            if start + size < lo:
+                start += size
+    elif np.count_nonzero(near_edge(values + size / 2)) < 0.1 * values.size and (
+            np.count_nonzero(near_edge(values)) > 0.3 * values.size or near_edge(lo) or near_edge(hi)):
+        start += size / 2 if start + size / 2 < lo else -size / 2
+    
+    # A value landing on the end edge can fall past the last bin, which
+    # plotly.js leaves out of the counts
+    nbins = 1 + int(np.floor((hi - start) / size))
+    bins = np.floor((values - start) / size + 1e-9).astype(np.intp)
+    kept = bins < nbins
+    counts = np.bincount(bins[kept], minlength=nbins)
+    centers = start + (np.arange(nbins) + 0.5) * size
+    return centers, counts, size, _bin_span_labels(values[kept], bins[kept], start, size, nbins, centers)
+
+# Hover text for each bar as the histogram trace shows it: the bin's span
+# rounded to the digits that tell the data apart ("6 - 6.2"), or the value
+# itself when no bin holds two different values. Mirrors
+# getBinSpanLabelRound in plotly.js (src/traces/histogram/calc.js)
+def _bin_span_labels(values, bins, start, size, nbins, centers):
+    edges = np.cumsum(np.r_[start, np.full(nbins, size)])
+    left_gap = np.min(values - edges[bins], initial=np.inf)
+    right_gap = np.min(edges[bins + 1] - values, initial=np.inf)
+    
+    def digit_changed(v1, v2):
+        if v1 * v2 <= 0:
+            return np.inf
+        digit = 10 ** np.floor(np.log10(abs(v2 - v1)))
+        for _ in range(10):
+            next_digit = 10 ** np.floor(np.log10(digit * 80))
+            if next_digit == digit or np.floor(v2 / next_digit) - np.floor(v1 / next_digit) <= 0.1:
+                break
+            digit = next_digit
+        return digit
+    
+    dv0, dv1 = -1.1 * right_gap, -0.1 * right_gap
+    dv2 = left_gap - dv1
+    left_digit = min(digit_changed(e + dv1, e + dv2) for e in edges[:2])
+    right_digit = min(digit_changed(e + dv0, e + dv1) for e in edges[:2])
+    disambiguate = not (left_digit > right_digit and right_digit < abs(edges[1] - edges[0]) / 4000)
+    digit = min(left_digit, right_digit)
+    
+    def round_edge(v, is_right=False):
+        rounded = digit * np.floor(v / digit + 0.5)
+        if rounded + digit / 10 < v and rounded + digit * 0.9 < v + left_gap:
+            rounded += digit
+        return rounded - digit if is_right and disambiguate else rounded
+    
+    order = np.lexsort((values, bins))
+    sorted_bins, sorted_values = bins[order], values[order]
+    same_bin = sorted_bins[1:] == sorted_bins[:-1]
+    if not np.any(same_bin & (sorted_values[1:] != sorted_values[:-1])):
+        spans = centers.copy()
+        spans[sorted_bins] = sorted_values
+        spans = np.column_stack((spans, spans))
+    else:
+        spans = np.column_stack(([round_edge(e) for e in edges[:-1]],
+                                 [round_edge(e, True) for e in edges[1:]]))
+    return [_hover_number(a) if a == b else f"{_hover_number(a)} - {_hover_number(b)}" for a, b in spans]
+
+# Numbers as plotly.js formats them in hover labels: four digits past the
+# two it would show on a tick at the value's own scale
+def _hover_number(v):
+    decimals = max(0, 6 - int(np.floor(np.log10(abs(v) or 1) + 0.01)))
+    return f"{v:.{decimals}f}".rstrip('0').rstrip('.')
+
+# Positions of the first of each set of identical points; exact duplicates
+# draw the same marker, so only one of each needs to reach the browser
+def _distinct_points(*columns):
+    _, first = np.unique(np.column_stack(columns), axis=0, return_index=True)
+    return np.sort(first)
 
 # ============================================================================
 # APP INITIALIZATION
 # ============================================================================
 
 # สร้าง Flask server ก่อน
-from flask import Flask
 server = Flask(__name__)
 
+# Route Flask's JSON handling (request bodies, jsonify responses such as
+# Dash's dependency list) through orjson instead of the stdlib encoder
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+server.json = OrjsonProvider(server)
+
+# Callback responses and the layout are encoded by plotly's JSON helper;
+# pin it to orjson rather than letting "auto" fall back to the stdlib
+# encoder if orjson ever fails to import
+pio.json.config.default_engine = "orjson"
+
 # จากนั้นเริ่มต้น Dash app
+# compress=True gzips callback responses, layout and assets via flask-compress
 app = dash.Dash(
     __name__,
     server=server,
+    compress=True,
     meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}]
 )
 app.title = "Sleep Health Analysis Dashboard"
@@ -96,6 +514,25 @@ app.title = "Sleep Health Analysis Dashboard"
 # LAYOUT COMPONENTS
 # ============================================================================
 
+# Shared component styles, built once and reused by reference
+CARD_STYLE = {
+    "backgroundColor": "var(--card)",
+    "borderRadius": "10px",
+    "padding": "1rem",
+    "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
+    "height": "100%",
+}
+
+PANEL_STYLE = {
+    "backgroundColor": "var(--card)",
+    "borderRadius": "10px",
+    "padding": "1.5rem",
+    "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
+    "marginBottom": "1.5rem"
+}
+
+DROPDOWN_STYLE = {"width": "100%", "color": "#334155"}
+
 def create_card(title, value, icon, color, description=None):
     return html.Div([
         html.Div([
@@ -106,14 +543,7 @@ def create_card(title, value, icon, color, description=None):
             html.Div(value, 
                     style={"fontSize": "2rem", "fontWeight": "bold", "color": color, "margin": "0.5rem 0"}),
             html.P(description, style={"margin": "0", "fontSize": "0.8rem", "color": "var(--muted)"}) if description else None
-        ], style={
-            "backgroundColor": "var(--card)", 
-            "borderRadius": "10px", 
-            "padding": "1rem",
-            "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-            "height": "100%",
-            "borderLeft": f"4px solid {color}"
-        })
+        ], style={**CARD_STYLE, "borderLeft": f"4px solid {color}"})
     ], className="three columns", style={"marginBottom": "1rem"})
 
 def create_filter_section():
@@ -124,57 +554,135 @@ def create_filter_section():
                 html.Div([
                     html.Label("Gender:", style={"fontWeight": "600", "color": "var(--text)"}),
                     dcc.Dropdown(
-                        options=[{"label": "All Genders", "value": "All"}] + 
-                               [{"label": g, "value": g} for g in df['gender'].unique()],
+                        options=[],
                         value="All",
                         id='gender-filter',
-                        style={"width": "100%", "color": "#334155"}
+                        style=DROPDOWN_STYLE
                     ),
                 ], className="three columns"),
                 html.Div([
                     html.Label("Age Group:", style={"fontWeight": "600", "color": "var(--text)"}),
                     dcc.Dropdown(
-                        options=[{"label": "All Ages", "value": "All"}] + 
-                               [{"label": g, "value": g} for g in df['age_group'].unique()],
+                        options=[],
                         value="All",
                         id='age-filter',
-                        style={"width": "100%", "color": "#334155"}
+                        style=DROPDOWN_STYLE
                     ),
                 ], className="three columns"),
                 html.Div([
                     html.Label("Occupation:", style={"fontWeight": "600", "color": "var(--text)"}),
                     dcc.Dropdown(
-                        options=[{"label": "All Occupations", "value": "All"}] + 
-                               [{"label": o, "value": o} for o in df['occupation'].unique()],
+                        options=[],
                         value="All",
                         id='occupation-filter',
-                        style={"width": "100%", "color": "#334155"}
+                        style=DROPDOWN_STYLE
                     ),
                 ], className="three columns"),
                 html.Div([
                     html.Label("Sleep Disorder:", style={"fontWeight": "600", "color": "var(--text)"}),
                     dcc.Dropdown(
-                        options=[{"label": "All", "value": "All"}] + 
-                               [{"label": s, "value": s} for s in df['sleep_disorder'].unique()],
+                        options=[],
                         value="All",
                         id='disorder-filter',
-                        style={"width": "100%", "color": "#334155"}
+                        style=DROPDOWN_STYLE
                     ),
                 ], className="three columns"),
             ], className="row"),
-        ], style={
-            "backgroundColor": "var(--card)", 
-            "borderRadius": "10px", 
-            "padding": "1.5rem",
-            "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-            "marginBottom": "1.5rem"
-        })
+        ], style=PANEL_STYLE)
     ])
 
 # ============================================================================
 # APP LAYOUT
 # ============================================================================
 
+# Static text panels that only vary by theme colors, built once per theme
+def _stress_tips(theme_colors):
+    text_color = theme_colors["text"]
+    bg_color = theme_colors["background"]
+    return html.Div([
+        html.H3("Stress Management Tips", style={"color": theme_colors["accent1"]}),
+        html.Div([
+            html.Div([
+                html.H4("Deep Breathing", style={"color": text_color}),
+                html.P("Take 5 deep breaths before bed to activate your parasympathetic nervous system.")
+            ], style={"marginBottom": "1rem"}),
+            html.Div([
+                html.H4("Digital Detox", style={"color": text_color}),
+                html.P("Avoid screens 1 hour before bedtime to reduce stress and improve sleep quality.")
+            ], style={"marginBottom": "1rem"}),
+            html.Div([
+                html.H4("Meditation", style={"color": text_color}),
+                html.P("Regular meditation practice can lower baseline stress levels and improve sleep.")
+            ]),
+        ], style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
+    ], className="four columns")
+
+def _activity_tips(theme_colors):
+    text_color = theme_colors["text"]
+    bg_color = theme_colors["background"]
+    return html.Div([
+        html.H3("Activity Recommendations", style={"color": theme_colors["accent1"]}),
+        html.Div([
+            html.Div([
+                html.H4("Timing Matters", style={"color": text_color}),
+                html.P("Exercise earlier in the day for better sleep. Avoid vigorous activity 2-3 hours before bed.")
+            ], style={"marginBottom": "1rem"}),
+            html.Div([
+                html.H4("Step Goal", style={"color": text_color}),
+                html.P("Aim for 7,000-10,000 steps daily for improved sleep quality and overall health.")
+            ], style={"marginBottom": "1rem"}),
+            html.Div([
+                html.H4("Consistency", style={"color": text_color}),
+                html.P("Regular moderate exercise is better for sleep than occasional intense workouts.")
+            ]),
+        ], style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
+    ], className="four columns")
+
+def _bmi_note(theme_colors):
+    text_color = theme_colors["text"]
+    return html.Div([
+        html.H3("BMI Impact on Sleep", style={"color": theme_colors["accent1"], "marginTop": "1rem"}),
+        html.P([
+            "BMI categories can significantly impact sleep quality and duration. ",
+            "Those with higher BMI values often experience sleep apnea and other disorders. ",
+            "Maintaining a healthy weight through balanced diet and regular exercise can improve sleep patterns."
+        ], style={"color": text_color})
+    ])
+
+def _key_factors(theme_colors):
+    text_color = theme_colors["text"]
+    bg_color = theme_colors["background"]
+    return html.Div([
+        html.H3("Key Factors for Better Sleep", style={"color": theme_colors["accent1"], "marginTop": "1.5rem"}),
+        html.Div([
+            html.Div([
+                html.Div([
+                    html.H4("1. Consistent Schedule", style={"color": text_color}),
+                    html.P("Go to bed and wake up at the same time every day, even on weekends.")
+                ], style={"marginBottom": "1rem"}),
+                html.Div([
+                    html.H4("2. Sleep Environment", style={"color": text_color}),
+                    html.P("Keep your bedroom dark, quiet, and cool (around 65°F or 18°C).")
+                ], style={"marginBottom": "1rem"}),
+            ], className="six columns"),
+            html.Div([
+                html.Div([
+                    html.H4("3. Limit Screen Time", style={"color": text_color}),
+                    html.P("Avoid screens for at least one hour before bedtime.")
+                ], style={"marginBottom": "1rem"}),
+                html.Div([
+                    html.H4("4. Watch Diet & Exercise", style={"color": text_color}),
+                    html.P("Avoid large meals, caffeine, and alcohol before bed. Exercise regularly but not too close to bedtime.")
+                ])
+            ], className="six columns"),
+        ], className="row", style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
+    ])
+
+STRESS_TIPS = {key: _stress_tips(theme_colors) for key, theme_colors in (('light', light_theme), ('dark', dark_theme))}
+ACTIVITY_TIPS = {key: _activity_tips(theme_colors) for key, theme_colors in (('light', light_theme), ('dark', dark_theme))}
+BMI_NOTE = {key: _bmi_note(theme_colors) for key, theme_colors in (('light', light_theme), ('dark', dark_theme))}
+KEY_FACTORS = {key: _key_factors(theme_colors) for key, theme_colors in (('light', light_theme), ('dark', dark_theme))}
+
 app.layout = html.Div(id="app-container", children=[
     # Theme toggle
     html.Div([
@@ -212,16 +720,20 @@ app.layout = html.Div(id="app-container", children=[
         html.Div([
             html.H2("Sleep Health Overview", style={"color": "var(--text)", "marginBottom": "1rem"}),
             html.Div([
-                # Cards will be populated by callback
-                html.Div(id="summary-cards", className="row"),
+                # Card values are filled in by a clientside callback; the
+                # accents follow the theme through the CSS variables
+                html.Div([
+                    create_card("Average Sleep Duration", html.Span(id="summary-sleep"), "😴", "var(--accent1)",
+                                "Recommended: 7-9 hours"),
+                    create_card("Average Sleep Quality", html.Span(id="summary-quality"), "✨", "var(--accent2)",
+                                "Higher is better"),
+                    create_card("Average Stress Level", html.Span(id="summary-stress"), "😓", "var(--accent4)",
+                                "Lower is better"),
+                    create_card("Physical Activity", html.Span(id="summary-activity"), "🏃", "var(--accent3)",
+                                "Aim for >60"),
+                ], id="summary-cards", className="row"),
             ]),
-        ], style={
-            "backgroundColor": "var(--card)", 
-            "borderRadius": "10px", 
-            "padding": "1.5rem",
-            "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-            "marginBottom": "1.5rem"
-        }),
+        ], style=PANEL_STYLE),
         
         # Sleep Duration Section
         html.Div([
@@ -230,21 +742,15 @@ app.layout = html.Div(id="app-container", children=[
                 html.Div([
                     # Left column
                     html.Div([
-                        dcc.Graph(id='histogram-duration'),
+                        dcc.Graph(id='histogram-duration', figure=go.Figure(layout=HISTOGRAM_LAYOUTS['light'])),
                     ], className="six columns"),
                     
                     # Right column
                     html.Div([
-                        dcc.Graph(id='sleep-quality-by-duration'),
+                        dcc.Graph(id='sleep-quality-by-duration', figure=go.Figure(layout=SCATTER_LAYOUTS['light'])),
                     ], className="six columns"),
                 ], className="row"),
-            ], style={
-                "backgroundColor": "var(--card)", 
-                "borderRadius": "10px", 
-                "padding": "1.5rem",
-                "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-                "marginBottom": "1.5rem"
-            }),
+            ], style=PANEL_STYLE),
         ]),
         
         # Factors Affecting Sleep Section
@@ -264,13 +770,7 @@ app.layout = html.Div(id="app-container", children=[
                 }),
                 
                 html.Div(id="factor-content", style={"marginTop": "1rem"}),
-            ], style={
-                "backgroundColor": "var(--card)", 
-                "borderRadius": "10px", 
-                "padding": "1.5rem",
-                "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-                "marginBottom": "1.5rem"
-            }),
+            ], style=PANEL_STYLE),
         ]),
 
         
@@ -279,13 +779,7 @@ app.layout = html.Div(id="app-container", children=[
             html.Div([
                 html.H2("Sleep Health Insights", style={"color": "var(--text)", "marginBottom": "1rem"}),
                 html.Div(id="personalized-insights"),
-            ], style={
-                "backgroundColor": "var(--card)", 
-                "borderRadius": "10px", 
-                "padding": "1.5rem",
-                "boxShadow": "0 4px 6px rgba(0, 0, 0, 0.05)",
-                "marginBottom": "1.5rem"
-            }),
+            ], style=PANEL_STYLE),
         ]),
         
     ], style={"maxWidth": "1400px", "margin": "0 auto", "padding": "1rem"}),
@@ -293,6 +787,20 @@ app.layout = html.Div(id="app-container", children=[
     # Store the current theme
     dcc.Store(id='theme-store', data='light'),
     
+    # Current filter selection as [gender, age group, occupation, disorder]
+    dcc.Store(id='filter-store', data=["All", "All", "All", "All"]),
+    
+    # Dropdown options, copied into the filters by a clientside callback
+    dcc.Store(id='filter-options', data={
+        'gender': GENDER_OPTS,
+        'age_group': AGE_OPTS,
+        'occupation': OCCUPATION_OPTS,
+        'disorder': DISORDER_OPTS,
+    }),
+    
+    # Summary-card values for every filter selection
+    dcc.Store(id='summary-values', data=SUMMARY_VALUES),
+    
     # Footer
     html.Footer([
         html.P("Sleep Health Analysis Dashboard | Created with Dash & Plotly", 
@@ -300,437 +808,383 @@ app.layout = html.Div(id="app-container", children=[
         html.P("Data updated: April 2025", 
               style={"textAlign": "center", "fontSize": "0.8rem", "color": "var(--muted)"})
     ], style={"padding": "1rem", "borderTop": "1px solid var(--muted)", "marginTop": "2rem"})
-], style={
+], className="", style={
     "backgroundColor": "var(--background)",
     "color": "var(--text)",
     "minHeight": "100vh",
     "transition": "all 0.3s ease",
-    "--background": light_theme["background"],
-    "--card": light_theme["card"],
-    "--text": light_theme["text"],
-    "--accent1": light_theme["accent1"],
-    "--accent2": light_theme["accent2"],
-    "--accent3": light_theme["accent3"],
-    "--accent4": light_theme["accent4"],
-    "--accent5": light_theme["accent5"],
-    "--muted": light_theme["muted"],
 })
 
 # ============================================================================
 # CALLBACKS
 # ============================================================================
 
+# Fill the filter dropdowns from the options store in the browser
+app.clientside_callback(
+    """
+    function(options) {
+        return [options.gender, options.age_group, options.occupation, options.disorder];
+    }
+    """,
+    [Output('gender-filter', 'options'),
+     Output('age-filter', 'options'),
+     Output('occupation-filter', 'options'),
+     Output('disorder-filter', 'options')],
+    [Input('filter-options', 'data')]
+)
+
+# Collect the four dropdowns into the filter store in the browser, so the
+# data callbacks depend on a single input instead of every dropdown
+app.clientside_callback(
+    """
+    function(gender, ageGroup, occupation, disorder) {
+        return [gender, ageGroup, occupation, disorder];
+    }
+    """,
+    Output('filter-store', 'data'),
+    [Input('gender-filter', 'value'),
+     Input('age-filter', 'value'),
+     Input('occupation-filter', 'value'),
+     Input('disorder-filter', 'value')]
+)
+
 # Toggle theme callback
-@app.callback(
-    [Output('app-container', 'style'),
+# The CSS variables live in assets/theme.css; switching themes only flips
+# the container class, and the flip itself runs in the browser
+app.clientside_callback(
+    """
+    function(n_clicks, current) {
+        if (!n_clicks) {
+            const noUpdate = window.dash_clientside.no_update;
+            return [noUpdate, noUpdate, noUpdate];
+        }
+        if (current === 'light') {
+            return ["dark", 'dark', "☀️ Light Mode"];
+        }
+        return ["", 'light', "🌙 Dark Mode"];
+    }
+    """,
+    [Output('app-container', 'className'),
      Output('theme-store', 'data'),
      Output('theme-toggle', 'children')],
     [Input('theme-toggle', 'n_clicks')],
     [State('theme-store', 'data')]
 )
-def toggle_theme(n_clicks, current):
-    if n_clicks is None:
-        return dash.no_update, dash.no_update, dash.no_update
-    
-    if current == 'light':
-        theme = dark_theme
-        new_theme = 'dark'
-        button_text = "☀️ Light Mode"
-    else:
-        theme = light_theme
-        new_theme = 'light'
-        button_text = "🌙 Dark Mode"
-    
-    return {
-        "backgroundColor": theme["background"],
-        "color": theme["text"],
-        "minHeight": "100vh",
-        "transition": "all 0.3s ease",
-        "--background": theme["background"],
-        "--card": theme["card"],
-        "--text": theme["text"],
-        "--accent1": theme["accent1"],
-        "--accent2": theme["accent2"],
-        "--accent3": theme["accent3"],
-        "--accent4": theme["accent4"],
-        "--accent5": theme["accent5"],
-        "--muted": theme["muted"],
-    }, new_theme, button_text
-
-# Filter data callback
-@app.callback(
-    Output('summary-cards', 'children'),
-    [Input('gender-filter', 'value'),
-     Input('age-filter', 'value'),
-     Input('occupation-filter', 'value'),
-     Input('disorder-filter', 'value'),
-     Input('theme-store', 'data')]
-)
-def update_summary_cards(gender, age_group, occupation, disorder, theme):
-    # Select theme colors
-    theme_colors = dark_theme if theme == 'dark' else light_theme
-    
-    # Filter data
-    filtered_df = df.copy()
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['gender'] == gender]
-    if age_group != "All":
-        filtered_df = filtered_df[filtered_df['age_group'] == age_group]
-    if occupation != "All":
-        filtered_df = filtered_df[filtered_df['occupation'] == occupation]
-    if disorder != "All":
-        filtered_df = filtered_df[filtered_df['sleep_disorder'] == disorder]
-    
-    # Calculate metrics
-    avg_sleep = filtered_df['sleep_duration'].mean()
-    avg_quality = filtered_df['quality_of_sleep'].mean()
-    avg_stress = filtered_df['stress_level'].mean()
-    avg_activity = filtered_df['physical_activity_level'].mean()
-    
-    # Create summary cards
-    cards = [
-        create_card("Average Sleep Duration", f"{avg_sleep:.1f} hrs", "😴", theme_colors["accent1"], 
-                   "Recommended: 7-9 hours"),
-        create_card("Average Sleep Quality", f"{avg_quality:.1f}/10", "✨", theme_colors["accent2"], 
-                   "Higher is better"),
-        create_card("Average Stress Level", f"{avg_stress:.1f}/10", "😓", theme_colors["accent4"], 
-                   "Lower is better"),
-        create_card("Physical Activity", f"{avg_activity:.0f}/100", "🏃", theme_colors["accent3"], 
-                   "Aim for >60")
-    ]
-    
-    return cards
 
-# Update histogram callback
-@app.callback(
-    [Output('histogram-duration', 'figure'),
-     Output('sleep-quality-by-duration', 'figure')],
-    [Input('gender-filter', 'value'),
-     Input('age-filter', 'value'),
-     Input('occupation-filter', 'value'),
-     Input('disorder-filter', 'value'),
-     Input('theme-store', 'data')]
+# Summary cards: look the selection's precomputed values up in the browser
+app.clientside_callback(
+    """
+    function(filters, values) {
+        return values.by_filters[filters.join('|')] || values.no_rows;
+    }
+    """,
+    [Output('summary-sleep', 'children'),
+     Output('summary-quality', 'children'),
+     Output('summary-stress', 'children'),
+     Output('summary-activity', 'children')],
+    [Input('filter-store', 'data')],
+    [State('summary-values', 'data')]
 )
-def update_sleep_patterns(gender, age_group, occupation, disorder, theme):
+
+# Sleep pattern figures, memoized per selection and theme as plotly JSON so
+# theme toggles and revisited selections skip both plotting and to_plotly_json
+@functools.lru_cache(maxsize=256)
+def _build_sleep_patterns(gender, age_group, occupation, disorder, theme):
     # Select theme colors
+    theme_key = 'dark' if theme == 'dark' else 'light'
     theme_colors = dark_theme if theme == 'dark' else light_theme
-    bg_color = theme_colors["background"]
-    text_color = theme_colors["text"]
     
-    # Filter data
-    filtered_df = df.copy()
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['gender'] == gender]
-    if age_group != "All":
-        filtered_df = filtered_df[filtered_df['age_group'] == age_group]
-    if occupation != "All":
-        filtered_df = filtered_df[filtered_df['occupation'] == occupation]
-    if disorder != "All":
-        filtered_df = filtered_df[filtered_df['sleep_disorder'] == disorder]
-    
-    # Create histogram
-    fig1 = px.histogram(
-        filtered_df, 
-        x='sleep_duration', 
-        nbins=20,
-        color_discrete_sequence=[theme_colors["accent1"]],
-        opacity=0.7,
-        labels={'sleep_duration': 'Sleep Duration (hours)'}
-    )
+    # Row positions of the selection
+    rows = get_filtered_indices(gender, age_group, occupation, disorder)
+    sleep_duration = DATA.sleep_duration[rows]
     
-    # Add reference zones for healthy sleep
-    fig1.add_vrect(
-        x0=7, x1=9,
-        fillcolor=theme_colors["accent2"], opacity=0.15,
-        layer="below", line_width=0,
-        annotation_text="Recommended Sleep Range",
-        annotation_position="top right"
+    # Histogram as precomputed bars on the prebuilt layout
+    centers, counts, width, labels = _histogram_bins(sleep_duration)
+    fig1 = go.Figure(
+        data=[go.Bar(
+            x=centers,
+            y=counts,
+            width=width,
+            marker_color=theme_colors["accent1"],
+            marker_opacity=0.7,
+            customdata=labels,
+            hovertemplate="Sleep Duration (hours)=%{customdata}<br>count=%{y}<extra></extra>"
+        )],
+        layout=HISTOGRAM_LAYOUTS[theme_key]
     )
     
-    # Update layout
-    fig1.update_layout(
-        title="Sleep Duration Distribution",
-        template="plotly_dark" if theme == 'dark' else "plotly_white",
-        margin=dict(l=40, r=40, t=60, b=40),
-        plot_bgcolor=theme_colors["card"],
-        paper_bgcolor=theme_colors["card"],
-        font=dict(color=text_color),
-        height=350
-    )
+    # Create quality by duration scatter: one WebGL trace per gender present,
+    # in order of appearance, sized by activity level
+    quality = DATA.quality_of_sleep[rows]
+    activity = DATA.physical_activity_level[rows]
+    gender_codes = DATA.gender_code[rows]
+    sizeref = _marker_sizeref(activity)
+    first_seen = np.sort(np.unique(gender_codes, return_index=True)[1])
+    traces = []
+    for i, code in enumerate(gender_codes[first_seen]):
+        label = DATA.gender_cats[code]
+        in_group = gender_codes == code
+        traces.append(go.Scattergl(
+            x=sleep_duration[in_group],
+            y=quality[in_group],
+            mode='markers',
+            name=label,
+            legendgroup=label,
+            marker=dict(color=theme_colors["chart_colors"][i % len(theme_colors["chart_colors"])], opacity=0.8,
+                        size=activity[in_group], sizemode='area', sizeref=sizeref),
+            hovertemplate=f"gender={label}<br>Sleep Duration (hours)=%{{x}}<br>Sleep Quality (1-10)=%{{y}}"
+                          "<br>Activity Level=%{marker.size}<extra></extra>"
+        ))
+    fig2 = go.Figure(data=traces, layout=SCATTER_LAYOUTS[theme_key])
     
-    # Create quality by duration scatter
-    fig2 = px.scatter(
-        filtered_df,
-        x='sleep_duration',
-        y='quality_of_sleep',
-        color='gender',
-        size='physical_activity_level',
-        color_discrete_sequence=theme_colors["chart_colors"],
-        labels={
-            'sleep_duration': 'Sleep Duration (hours)',
-            'quality_of_sleep': 'Sleep Quality (1-10)',
-            'physical_activity_level': 'Activity Level'
-        },
-        opacity=0.8
-    )
+    return fig1.to_plotly_json(), fig2.to_plotly_json()
+
+# On a theme-only change the selection's figures for the previous theme are
+# already cached, so swap in this theme's layouts and trace colors instead of
+# rebuilding them from the data
+@functools.lru_cache(maxsize=256)
+def _restyle_sleep_patterns(gender, age_group, occupation, disorder, theme):
+    theme_key = 'dark' if theme == 'dark' else 'light'
+    theme_colors = dark_theme if theme == 'dark' else light_theme
+    previous = 'light' if theme_key == 'dark' else 'dark'
+    histogram, scatter = _build_sleep_patterns(gender, age_group, occupation, disorder, previous)
     
-    # Update layout
-    fig2.update_layout(
-        title="Sleep Quality vs. Duration",
-        template="plotly_dark" if theme == 'dark' else "plotly_white",
-        margin=dict(l=40, r=40, t=60, b=40),
-        plot_bgcolor=theme_colors["card"],
-        paper_bgcolor=theme_colors["card"],
-        font=dict(color=text_color),
-        height=350
-    )
+    histogram = {
+        'data': [{**trace, 'marker': {**trace['marker'], 'color': theme_colors["accent1"]}} for trace in histogram['data']],
+        'layout': HISTOGRAM_LAYOUTS[theme_key].to_plotly_json(),
+    }
     
-    return fig1, fig2
+    chart_colors = theme_colors["chart_colors"]
+    scatter = {
+        'data': [{**trace, 'marker': {**trace['marker'], 'color': chart_colors[i % len(chart_colors)]}}
+                 for i, trace in enumerate(scatter['data'])],
+        'layout': SCATTER_LAYOUTS[theme_key].to_plotly_json(),
+    }
+    return histogram, scatter
 
-# Update factors tab content
+# Update histogram callback
 @app.callback(
-    Output('factor-content', 'children'),
-    [Input('factor-tabs', 'value'),
-     Input('gender-filter', 'value'),
-     Input('age-filter', 'value'),
-     Input('occupation-filter', 'value'),
-     Input('disorder-filter', 'value'),
+    [Output('histogram-duration', 'figure'),
+     Output('sleep-quality-by-duration', 'figure')],
+    [Input('filter-store', 'data'),
      Input('theme-store', 'data')]
 )
-def update_factor_content(tab, gender, age_group, occupation, disorder, theme):
+def update_sleep_patterns(filters, theme):
+    gender, age_group, occupation, disorder = filters
+    triggered = [t['prop_id'] for t in callback_context.triggered]
+    if triggered == ['theme-store.data']:
+        return _restyle_sleep_patterns(gender, age_group, occupation, disorder, theme)
+    figures = _build_sleep_patterns(gender, age_group, occupation, disorder, theme)
+    if triggered != ['filter-store.data']:
+        return figures
+    
+    # On a filter-only change the graphs already show this theme's layout,
+    # so only the traces are sent
+    patches = []
+    for figure in figures:
+        patch = Patch()
+        patch['data'] = figure['data']
+        patches.append(patch)
+    return patches
+
+# Factors tab content, memoized per tab, selection and theme so revisiting
+# a combination skips rebuilding its figures
+@functools.lru_cache(maxsize=256)
+def _build_factor_content(tab, gender, age_group, occupation, disorder, theme):
     # Select theme colors
+    theme_key = 'dark' if theme == 'dark' else 'light'
     theme_colors = dark_theme if theme == 'dark' else light_theme
-    bg_color = theme_colors["background"]
-    text_color = theme_colors["text"]
-    
-    # Filter data
-    filtered_df = df.copy()
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['gender'] == gender]
-    if age_group != "All":
-        filtered_df = filtered_df[filtered_df['age_group'] == age_group]
-    if occupation != "All":
-        filtered_df = filtered_df[filtered_df['occupation'] == occupation]
-    if disorder != "All":
-        filtered_df = filtered_df[filtered_df['sleep_disorder'] == disorder]
     
-    template = "plotly_dark" if theme == 'dark' else "plotly_white"
+    # Row positions of the selection
+    rows = get_filtered_indices(gender, age_group, occupation, disorder)
     
     if tab == "stress":
-        # Create stress scatter plot
-        fig = px.scatter(
-            filtered_df, 
-            x='stress_level', 
-            y='sleep_duration',
-            color='quality_of_sleep',
-            color_continuous_scale=[theme_colors["accent4"], theme_colors["accent5"], theme_colors["accent2"]],
-            labels={
-                'stress_level': 'Stress Level (1-10)',
-                'sleep_duration': 'Sleep Duration (hours)',
-                'quality_of_sleep': 'Sleep Quality'
-            },
-            height=450
-        )
-        
-        # Add stress level zones
-        fig.add_hrect(
-            y0=7, y1=9,
-            fillcolor=theme_colors["accent2"], opacity=0.15,
-            layer="below", line_width=0,
-        )
-        
-        fig.update_layout(
-            template=template,
-            plot_bgcolor=theme_colors["card"],
-            paper_bgcolor=theme_colors["card"],
-            font=dict(color=text_color),
+        # Create stress scatter plot from the distinct points only
+        points = rows[_distinct_points(DATA.stress_level[rows], DATA.sleep_duration[rows],
+                                       DATA.quality_of_sleep[rows])]
+        fig = go.Figure(
+            data=[go.Scattergl(
+                x=DATA.stress_level[points],
+                y=DATA.sleep_duration[points],
+                mode='markers',
+                marker=dict(color=DATA.quality_of_sleep[points], coloraxis='coloraxis'),
+                showlegend=False,
+                hovertemplate="Stress Level (1-10)=%{x}<br>Sleep Duration (hours)=%{y}"
+                              "<br>Sleep Quality=%{marker.color}<extra></extra>"
+            )],
+            layout=STRESS_LAYOUTS[theme_key]
         )
         
         content = html.Div([
             html.Div([
                 html.Div([
-                    dcc.Graph(figure=fig),
+                    dcc.Graph(figure=fig.to_plotly_json()),
                 ], className="eight columns"),
-                html.Div([
-                    html.H3("Stress Management Tips", style={"color": theme_colors["accent1"]}),
-                    html.Div([
-                        html.Div([
-                            html.H4("Deep Breathing", style={"color": text_color}),
-                            html.P("Take 5 deep breaths before bed to activate your parasympathetic nervous system.")
-                        ], style={"marginBottom": "1rem"}),
-                        html.Div([
-                            html.H4("Digital Detox", style={"color": text_color}),
-                            html.P("Avoid screens 1 hour before bedtime to reduce stress and improve sleep quality.")
-                        ], style={"marginBottom": "1rem"}),
-                        html.Div([
-                            html.H4("Meditation", style={"color": text_color}),
-                            html.P("Regular meditation practice can lower baseline stress levels and improve sleep.")
-                        ]),
-                    ], style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
-                ], className="four columns"),
+                STRESS_TIPS[theme_key],
             ], className="row")
         ])
         
     elif tab == "activity":
-        # Create physical activity scatter plot
-        fig = px.scatter(
-            filtered_df, 
-            x='daily_steps', 
-            y='sleep_duration',
-            size='physical_activity_level',
-            color='heart_rate',
-            color_continuous_scale=[theme_colors["accent2"], theme_colors["accent5"], theme_colors["accent4"]],
-            labels={
-                'daily_steps': 'Daily Steps',
-                'sleep_duration': 'Sleep Duration (hours)',
-                'physical_activity_level': 'Activity Level',
-                'heart_rate': 'Heart Rate (bpm)'
-            },
-            height=450
-        )
-        
-        # Add reference line for recommended steps
-        fig.add_vline(
-            x=10000, line_width=2, line_dash="dash", line_color=theme_colors["accent1"],
-            annotation_text="10,000 steps goal", annotation_position="top right"
-        )
-        
-        fig.update_layout(
-            template=template,
-            plot_bgcolor=theme_colors["card"],
-            paper_bgcolor=theme_colors["card"],
-            font=dict(color=text_color),
+        # Create physical activity scatter plot from the distinct points only
+        points = rows[_distinct_points(DATA.daily_steps[rows], DATA.sleep_duration[rows],
+                                       DATA.heart_rate[rows], DATA.physical_activity_level[rows])]
+        activity = DATA.physical_activity_level[points]
+        fig = go.Figure(
+            data=[go.Scattergl(
+                x=DATA.daily_steps[points],
+                y=DATA.sleep_duration[points],
+                mode='markers',
+                marker=dict(color=DATA.heart_rate[points], coloraxis='coloraxis',
+                            size=activity, sizemode='area', sizeref=_marker_sizeref(activity)),
+                showlegend=False,
+                hovertemplate="Daily Steps=%{x}<br>Sleep Duration (hours)=%{y}<br>Activity Level=%{marker.size}"
+                              "<br>Heart Rate (bpm)=%{marker.color}<extra></extra>"
+            )],
+            layout=ACTIVITY_LAYOUTS[theme_key]
         )
         
         content = html.Div([
             html.Div([
                 html.Div([
-                    dcc.Graph(figure=fig),
+                    dcc.Graph(figure=fig.to_plotly_json()),
                 ], className="eight columns"),
-                html.Div([
-                    html.H3("Activity Recommendations", style={"color": theme_colors["accent1"]}),
-                    html.Div([
-                        html.Div([
-                            html.H4("Timing Matters", style={"color": text_color}),
-                            html.P("Exercise earlier in the day for better sleep. Avoid vigorous activity 2-3 hours before bed.")
-                        ], style={"marginBottom": "1rem"}),
-                        html.Div([
-                            html.H4("Step Goal", style={"color": text_color}),
-                            html.P("Aim for 7,000-10,000 steps daily for improved sleep quality and overall health.")
-                        ], style={"marginBottom": "1rem"}),
-                        html.Div([
-                            html.H4("Consistency", style={"color": text_color}),
-                            html.P("Regular moderate exercise is better for sleep than occasional intense workouts.")
-                        ]),
-                    ], style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
-                ], className="four columns"),
+                ACTIVITY_TIPS[theme_key],
             ], className="row")
         ])
         
     else:  # BMI tab
         # Create two plots for BMI section
 
-        filtered_df['bmi_category'] = filtered_df['bmi_category'].replace({
-        'Normal': 'Underweight',
-        'Normal Weight': 'Normal'
-        })
-
-        fig1 = px.box(
-        filtered_df, 
-        x='bmi_category', 
-        y='sleep_duration', 
-        color='bmi_category',
-        color_discrete_sequence=theme_colors["chart_colors"],
-        category_orders={"bmi_category": ["Obese", "Overweight", "Normal", "Underweight"]},
-        labels={'sleep_duration': 'Sleep Duration (hours)', 'bmi_category': 'BMI Category'},
-        height=350
+        # One box per BMI category present, drawn from precomputed statistics;
+        # colors follow the chart order
+        box_traces = []
+        boxes = get_bmi_box_stats(gender, age_group, occupation, disorder)
+        for i, label in enumerate(dict.fromkeys(BMI_ORDER + list(DATA.bmi_category_cats))):
+            if label not in boxes:
+                continue
+            box = boxes[label]
+            box_traces.append(go.Box(
+                x=[label],
+                q1=[box.q1], median=[box.median], q3=[box.q3],
+                lowerfence=[box.lowerfence], upperfence=[box.upperfence],
+                y=[box.outliers],
+                boxpoints='outliers',
+                name=label,
+                legendgroup=label,
+                offsetgroup=label,
+                alignmentgroup='True',
+                marker_color=theme_colors["chart_colors"][i % len(theme_colors["chart_colors"])],
+                hovertemplate="BMI Category=%{x}<br>Sleep Duration (hours)=%{y}<extra></extra>"
+            ))
+        fig1 = go.Figure(
+            data=box_traces,
+            layout=go.Layout(
+                xaxis=dict(title_text='BMI Category', categoryorder='array', categoryarray=BMI_ORDER),
+                yaxis_title='Sleep Duration (hours)',
+                legend=dict(title_text='BMI Category', tracegroupgap=0),
+                margin=dict(t=60),
+                boxmode='overlay',
+                height=350
+            )
         )
         
         fig1.update_layout(
             title="Sleep Duration by BMI Category",
-            template=template,
-            plot_bgcolor=theme_colors["card"],
-            paper_bgcolor=theme_colors["card"],
-            font=dict(color=text_color),
+            **LAYOUT_STYLES[theme_key],
             showlegend=False
         )
         
-        fig2 = px.scatter(
-            filtered_df,
-            x='bmi_category',
-            y='quality_of_sleep',
-            color='bmi_category',
-            size='physical_activity_level',
-            color_discrete_sequence=theme_colors["chart_colors"],
-            category_orders={"bmi_category": ["Obese", "Overweight", "Normal", "Underweight"]},
-            labels={'quality_of_sleep': 'Sleep Quality (1-10)', 'bmi_category': 'BMI Category'},
-            height=350
+        # One WebGL trace per BMI category present; colors follow the chart order
+        bmi_labels = np.asarray(DATA.bmi_category_cats, dtype=object)[DATA.bmi_category_code[rows]]
+        quality = DATA.quality_of_sleep[rows]
+        activity = DATA.physical_activity_level[rows]
+        sizeref = _marker_sizeref(activity)
+        present = set(bmi_labels)
+        traces = []
+        for i, label in enumerate(dict.fromkeys(BMI_ORDER + list(DATA.bmi_category_cats))):
+            if label not in present:
+                continue
+            in_group = bmi_labels == label
+            traces.append(go.Scattergl(
+                x=bmi_labels[in_group],
+                y=quality[in_group],
+                mode='markers',
+                name=label,
+                legendgroup=label,
+                marker=dict(color=theme_colors["chart_colors"][i % len(theme_colors["chart_colors"])],
+                            size=activity[in_group], sizemode='area', sizeref=sizeref),
+                hovertemplate="BMI Category=%{x}<br>Sleep Quality (1-10)=%{y}"
+                              "<br>physical_activity_level=%{marker.size}<extra></extra>"
+            ))
+        fig2 = go.Figure(
+            data=traces,
+            layout=go.Layout(
+                xaxis=dict(title_text='BMI Category', categoryorder='array', categoryarray=BMI_ORDER),
+                yaxis_title='Sleep Quality (1-10)',
+                legend=dict(title_text='BMI Category', itemsizing='constant'),
+                margin=dict(t=60),
+                height=350
+            )
         )
         
         fig2.update_layout(
             title="Sleep Quality by BMI Category",
-            template=template,
-            plot_bgcolor=theme_colors["card"],
-            paper_bgcolor=theme_colors["card"],
-            font=dict(color=text_color),
+            **LAYOUT_STYLES[theme_key],
             showlegend=False
         )
         
         content = html.Div([
             html.Div([
                 html.Div([
-                    dcc.Graph(figure=fig1),
+                    dcc.Graph(figure=fig1.to_plotly_json()),
                 ], className="six columns"),
                 html.Div([
-                    dcc.Graph(figure=fig2),
+                    dcc.Graph(figure=fig2.to_plotly_json()),
                 ], className="six columns"),
             ], className="row"),
-            html.Div([
-                html.H3("BMI Impact on Sleep", style={"color": theme_colors["accent1"], "marginTop": "1rem"}),
-                html.P([
-                    "BMI categories can significantly impact sleep quality and duration. ",
-                    "Those with higher BMI values often experience sleep apnea and other disorders. ",
-                    "Maintaining a healthy weight through balanced diet and regular exercise can improve sleep patterns."
-                ], style={"color": text_color})
-            ])
+            BMI_NOTE[theme_key]
         ])
     
     return content
 
+# Update factors tab content
+@app.callback(
+    Output('factor-content', 'children'),
+    [Input('factor-tabs', 'value'),
+     Input('filter-store', 'data'),
+     Input('theme-store', 'data')]
+)
+def update_factor_content(tab, filters, theme):
+    gender, age_group, occupation, disorder = filters
+    return _build_factor_content(tab, gender, age_group, occupation, disorder, theme)
+
 # Trend analysis callback
 @app.callback(
     [Output('age-trend-graph', 'figure'),
      Output('occupation-analysis', 'figure')],
-    [Input('gender-filter', 'value'),
-     Input('age-filter', 'value'),
-     Input('occupation-filter', 'value'),
-     Input('disorder-filter', 'value'),
+    [Input('filter-store', 'data'),
      Input('theme-store', 'data')]
 )
-def update_trend_analysis(gender, age_group, occupation, disorder, theme):
+def update_trend_analysis(filters, theme):
+    gender, age_group, occupation, disorder = filters
+    
     # Select theme colors
     theme_colors = dark_theme if theme == 'dark' else light_theme
-    text_color = theme_colors["text"]
     
-    # Filter data
-    filtered_df = df.copy()
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['gender'] == gender]
-    if age_group != "All":
-        filtered_df = filtered_df[filtered_df['age_group'] == age_group]
-    if occupation != "All":
-        filtered_df = filtered_df[filtered_df['occupation'] == occupation]
-    if disorder != "All":
-        filtered_df = filtered_df[filtered_df['sleep_disorder'] == disorder]
-    
-    template = "plotly_dark" if theme == 'dark' else "plotly_white"
-    
-    # Age trend analysis
-    age_analysis = filtered_df.groupby('age').agg({
-        'sleep_duration': 'mean',
-        'quality_of_sleep': 'mean',
-        'stress_level': 'mean'
-    }).reset_index()
+    # Row positions of the selection; no filtered frame is needed here
+    selected_rows = get_filtered_indices(gender, age_group, occupation, disorder)
+    selected_occupations = np.unique(DATA.occupation_code[selected_rows])
+    
+    theme_key = 'dark' if theme == 'dark' else 'light'
+    
+    # Age trend analysis: per-age means from bincount sums and counts
+    ages = DATA.age[selected_rows]
+    age_counts = np.bincount(ages)
+    observed_ages = np.flatnonzero(age_counts)
+    age_analysis = pd.DataFrame({'age': observed_ages})
+    for col in ('sleep_duration', 'quality_of_sleep', 'stress_level'):
+        sums = np.bincount(ages, weights=getattr(DATA, col)[selected_rows])
+        age_analysis[col] = sums[observed_ages] / age_counts[observed_ages]
     
     # Create age trend figure
     fig1 = go.Figure()
@@ -770,22 +1224,24 @@ def update_trend_analysis(gender, age_group, occupation, disorder, theme):
             side="right"
         ),
         xaxis=dict(title="Age"),
-        template=template,
-        plot_bgcolor=theme_colors["card"],
-        paper_bgcolor=theme_colors["card"],
-        font=dict(color=text_color),
+        **LAYOUT_STYLES[theme_key],
         legend=dict(orientation="h", y=1.1),
         margin=dict(l=40, r=40, t=20, b=40),
         height=400
     )
     
     # Occupation analysis
-    if len(filtered_df['occupation'].unique()) > 1:
-        occupation_analysis = filtered_df.groupby('occupation').agg({
-            'quality_of_sleep': 'mean',
-            'stress_level': 'mean',
-            'sleep_duration': 'mean'
-        }).reset_index()
+    if selected_occupations.size > 1:
+        # Per-occupation sums and counts with reduceat over the pre-sorted rows
+        selected = np.zeros(DATA.age.size)
+        selected[selected_rows] = 1
+        selected = selected[OCCUPATION_ORDER]
+        counts = np.add.reduceat(selected, OCCUPATION_STARTS)
+        observed = counts > 0
+        occupation_analysis = pd.DataFrame({'occupation': OCCUPATION_LABELS[observed]})
+        for col in ('quality_of_sleep', 'stress_level', 'sleep_duration'):
+            sums = np.add.reduceat(OCCUPATION_SORTED[col] * selected, OCCUPATION_STARTS)
+            occupation_analysis[col] = sums[observed] / counts[observed]
         
         occupation_analysis = occupation_analysis.sort_values('quality_of_sleep', ascending=False)
         
@@ -806,15 +1262,15 @@ def update_trend_analysis(gender, age_group, occupation, disorder, theme):
         ))
     else:
         # If only one occupation is selected, show comparison with average
-        selected_occupation = filtered_df['occupation'].iloc[0]
+        selected_occupation = DATA.occupation_cats[selected_occupations[0]]
         
         # Get the overall dataset averages
-        overall_avg_quality = df['quality_of_sleep'].mean()
-        overall_avg_stress = df['stress_level'].mean()
+        overall_avg_quality = DATA.quality_of_sleep.mean(dtype=np.float64)
+        overall_avg_stress = DATA.stress_level.mean(dtype=np.float64)
         
         # Get averages for selected occupation
-        selected_avg_quality = filtered_df['quality_of_sleep'].mean()
-        selected_avg_stress = filtered_df['stress_level'].mean()
+        selected_avg_quality = DATA.quality_of_sleep[selected_rows].mean(dtype=np.float64)
+        selected_avg_stress = DATA.stress_level[selected_rows].mean(dtype=np.float64)
         
         fig2 = go.Figure()
         
@@ -834,17 +1290,14 @@ def update_trend_analysis(gender, age_group, occupation, disorder, theme):
     
     fig2.update_layout(
         barmode='group',
-        title=f"{'Sleep Quality & Stress by Occupation' if len(filtered_df['occupation'].unique()) > 1 else f'Comparing {selected_occupation} with Average'}",
-        template=template,
-        plot_bgcolor=theme_colors["card"],
-        paper_bgcolor=theme_colors["card"],
-        font=dict(color=text_color),
+        title=f"{'Sleep Quality & Stress by Occupation' if selected_occupations.size > 1 else f'Comparing {selected_occupation} with Average'}",
+        **LAYOUT_STYLES[theme_key],
         margin=dict(l=40, r=40, t=60, b=90),
         height=400
     )
     
     # Rotate x-axis labels if needed
-    if len(filtered_df['occupation'].unique()) > 3:
+    if selected_occupations.size > 3:
         fig2.update_layout(
             xaxis=dict(
                 tickangle=45,
@@ -853,38 +1306,21 @@ def update_trend_analysis(gender, age_group, occupation, disorder, theme):
     
     return fig1, fig2
 
-# Personalized insights callback
-@app.callback(
-    Output('personalized-insights', 'children'),
-    [Input('gender-filter', 'value'),
-     Input('age-filter', 'value'),
-     Input('occupation-filter', 'value'),
-     Input('disorder-filter', 'value'),
-     Input('theme-store', 'data')]
-)
-def update_personalized_insights(gender, age_group, occupation, disorder, theme):
+# Insights block, memoized per selection and theme so repeated combinations
+# reuse the built component tree
+@functools.lru_cache(maxsize=256)
+def _build_insights(gender, age_group, occupation, disorder, theme):
     # Select theme colors
+    theme_key = 'dark' if theme == 'dark' else 'light'
     theme_colors = dark_theme if theme == 'dark' else light_theme
-    bg_color = theme_colors["background"]
-    text_color = theme_colors["text"]
-    
-    # Filter data
-    filtered_df = df.copy()
-    if gender != "All":
-        filtered_df = filtered_df[filtered_df['gender'] == gender]
-    if age_group != "All":
-        filtered_df = filtered_df[filtered_df['age_group'] == age_group]
-    if occupation != "All":
-        filtered_df = filtered_df[filtered_df['occupation'] == occupation]
-    if disorder != "All":
-        filtered_df = filtered_df[filtered_df['sleep_disorder'] == disorder]
     
     # Calculate key metrics
-    avg_sleep = filtered_df['sleep_duration'].mean()
-    avg_quality = filtered_df['quality_of_sleep'].mean()
-    sleep_disorders_pct = (filtered_df['sleep_disorder'] != 'None').mean() * 100
-    high_stress_pct = (filtered_df['stress_level'] > 7).mean() * 100
-    low_activity_pct = (filtered_df['physical_activity_level'] < 50).mean() * 100
+    stats = get_selection_stats(gender, age_group, occupation, disorder)
+    avg_sleep = stats.avg_sleep
+    avg_quality = stats.avg_quality
+    sleep_disorders_pct = stats.sleep_disorders_pct
+    high_stress_pct = stats.high_stress_pct
+    low_activity_pct = stats.low_activity_pct
     
     # Generate insights
     insights = []
@@ -952,34 +1388,25 @@ def update_personalized_insights(gender, age_group, occupation, disorder, theme)
         ], style={"marginBottom": "1rem"}))
     
     # Key sleep factors
-    top_factors = html.Div([
-        html.H3("Key Factors for Better Sleep", style={"color": theme_colors["accent1"], "marginTop": "1.5rem"}),
-        html.Div([
-            html.Div([
-                html.Div([
-                    html.H4("1. Consistent Schedule", style={"color": text_color}),
-                    html.P("Go to bed and wake up at the same time every day, even on weekends.")
-                ], style={"marginBottom": "1rem"}),
-                html.Div([
-                    html.H4("2. Sleep Environment", style={"color": text_color}),
-                    html.P("Keep your bedroom dark, quiet, and cool (around 65°F or 18°C).")
-                ], style={"marginBottom": "1rem"}),
-            ], className="six columns"),
-            html.Div([
-                html.Div([
-                    html.H4("3. Limit Screen Time", style={"color": text_color}),
-                    html.P("Avoid screens for at least one hour before bedtime.")
-                ], style={"marginBottom": "1rem"}),
-                html.Div([
-                    html.H4("4. Watch Diet & Exercise", style={"color": text_color}),
-                    html.P("Avoid large meals, caffeine, and alcohol before bed. Exercise regularly but not too close to bedtime.")
-                ])
-            ], className="six columns"),
-        ], className="row", style={"backgroundColor": bg_color, "padding": "1rem", "borderRadius": "8px"})
-    ])
+    top_factors = KEY_FACTORS[theme_key]
     
     return html.Div(insights + [top_factors])
 
+# Personalized insights callback
+@app.callback(
+    Output('personalized-insights', 'children'),
+    [Input('filter-store', 'data'),
+     Input('theme-store', 'data')]
+)
+def update_personalized_insights(filters, theme):
+    gender, age_group, occupation, disorder = filters
+    return _build_insights(gender, age_group, occupation, disorder, theme)
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 8080))
-    app.run_server(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
+    # Production settings spelled out: no dev tools UI, no prop validation
+    # of callback outputs and minified component bundles, even if debug is
+    # switched on for a local run
+    app.run_server(host='0.0.0.0', port=port, debug=False,
+                   dev_tools_ui=False, dev_tools_props_check=False,
+                   dev_tools_serve_dev_bundles=False)
\ No newline at end of file
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The app reads its CSV relative to the working directory, as it does when
+# gunicorn starts it from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import SleepHealth_Analysis_Main as app  # noqa: E402
+
+
+# Rows of a filter selection, filtered with pandas masks one column at a time
+# as the dashboard originally did, to check precomputed values against
+@pytest.fixture
+def filtered_frame():
+    def select(key):
+        frame = app.df
+        for col, value in zip(app.FILTER_COLUMNS, key):
+            if value != "All":
+                frame = frame[frame[col] == value]
+        return frame
+    return select
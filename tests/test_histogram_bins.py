@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import SleepHealth_Analysis_Main as app
+
+
+# Bars for the sleep duration histogram, as plotly.js autobins the same
+# selections with nbinsx=20
+@pytest.mark.parametrize("key, first_center, counts", [
+    (("All", "All", "All", "All"), 5.7,
+     [0, 4, 18, 8, 15, 8, 6, 7, 15, 6, 12, 11, 10, 6, 6]),
+    (("Female", "All", "All", "All"), 5.7,
+     [0, 2, 9, 3, 7, 5, 4, 4, 7, 2, 0, 1, 9, 6, 6]),
+    # The two 8.2 hour rows fall a rounding error past the last bin edge
+    (("All", "All", "Nurse", "All"), 5.9,
+     [1, 9, 2, 4, 0, 0, 1, 0, 1, 0, 1, 8]),
+])
+def test_sleep_duration_bins(key, first_center, counts):
+    rows = app.get_filtered_indices(*key)
+    centers, bin_counts, size, labels = app._histogram_bins(app.DATA.sleep_duration[rows])
+    
+    assert size == pytest.approx(0.2)
+    np.testing.assert_array_equal(bin_counts, counts)
+    np.testing.assert_allclose(centers, first_center + 0.2 * np.arange(len(counts)))
+    assert len(labels) == len(counts)
+
+
+# Hover labels show each bin's span as the histogram trace did, rounded to
+# the 0.1 hour steps the durations are recorded in
+def test_sleep_duration_hover_labels():
+    rows = app.get_filtered_indices("All", "All", "All", "All")
+    labels = app._histogram_bins(app.DATA.sleep_duration[rows])[3]
+    
+    assert labels[:3] == ["5.6 - 5.7", "5.8 - 5.9", "6 - 6.1"]
+    assert labels[-1] == "8.4 - 8.5"
+
+
+def test_integer_values_are_centered_on_bins():
+    centers, counts, size, labels = app._histogram_bins(np.array([1.0, 2, 2, 3, 5, 8]))
+    
+    assert size == 0.5
+    np.testing.assert_allclose(centers, np.arange(1, 8.5, 0.5))
+    np.testing.assert_array_equal(counts, [1, 0, 2, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1])
+    # Each bin holds a single distinct value, which the hover shows alone
+    assert labels[:4] == ["1", "1.5", "2", "2.5"]
+    assert labels[-1] == "8"
+
+
+def test_no_values_give_no_bars():
+    centers, counts, size, labels = app._histogram_bins(np.zeros(0))
+    
+    assert centers.size == counts.size == len(labels) == 0
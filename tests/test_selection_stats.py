@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import SleepHealth_Analysis_Main as app
+
+FILTER_KEYS = list(app.FILTER_MASKS)
+
+
+def _pandas_stats(frame):
+    return {
+        'avg_sleep': frame['sleep_duration'].mean(),
+        'avg_quality': frame['quality_of_sleep'].mean(),
+        'avg_stress': frame['stress_level'].mean(),
+        'avg_activity': frame['physical_activity_level'].mean(),
+        'sleep_disorders_pct': (frame['sleep_disorder'] != 'None').mean() * 100,
+        'high_stress_pct': (frame['stress_level'] > 7).mean() * 100,
+        'low_activity_pct': (frame['physical_activity_level'] < 50).mean() * 100,
+    }
+
+
+def _texts(component):
+    children = getattr(component, 'children', None)
+    if isinstance(children, str):
+        return [children]
+    if children is None:
+        return []
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    return [text for child in children for text in _texts(child)]
+
+
+@pytest.mark.parametrize("key", FILTER_KEYS)
+def test_selection_stats_match_pandas_means(key, filtered_frame):
+    expected = _pandas_stats(filtered_frame(key))
+    stats = app.get_selection_stats(*key)
+    np.testing.assert_array_equal(
+        [getattr(stats, name) for name in app.STAT_NAMES],
+        [expected[name] for name in app.STAT_NAMES],
+    )
+
+
+@pytest.mark.parametrize("key", FILTER_KEYS)
+def test_insights_match_pandas_means(key, filtered_frame):
+    expected = _pandas_stats(filtered_frame(key))
+    texts = _texts(app._build_insights(*key, 'light'))
+    
+    sleep, quality = expected['avg_sleep'], expected['avg_quality']
+    sleep_verdict = ("which is significantly below" if sleep < 6 else
+                     "slightly below" if sleep < 7 else "which falls within")
+    quality_verdict = ("significant" if quality < 5 else
+                       "room for" if quality < 7 else "generally good")
+    assert any(text.startswith(f"The average sleep duration is {sleep:.1f} hours, {sleep_verdict}")
+               for text in texts)
+    assert any(text.startswith(f"The average sleep quality rating is {quality:.1f}/10, indicating {quality_verdict}")
+               for text in texts)
+    for name, threshold in (('high_stress_pct', 50), ('low_activity_pct', 60), ('sleep_disorders_pct', 30)):
+        shown = any(text.startswith(f"{expected[name]:.1f}% of individuals") for text in texts)
+        assert shown == (expected[name] > threshold)
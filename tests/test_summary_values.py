@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import SleepHealth_Analysis_Main as app
+
+
+# Card strings as the server callback formatted them: one decimal for the
+# hour and rating averages, none for the activity level
+def test_summary_values_formatting():
+    stats = SimpleNamespace(avg_sleep=7.04, avg_quality=7.36, avg_stress=5.0, avg_activity=59.5)
+    
+    assert app._summary_values(stats) == ["7.0 hrs", "7.4/10", "5.0/10", "60/100"]
+
+
+def test_summary_values_are_keyed_by_joined_filters():
+    key = ("Female", "All", "Nurse", "All")
+    
+    assert app.SUMMARY_VALUES['by_filters']["|".join(key)] == \
+        app._summary_values(app.get_selection_stats(*key))
+
+
+def test_summary_values_cover_every_filter_key():
+    assert len(app.SUMMARY_VALUES['by_filters']) == len(app.FILTER_MASKS)
+
+
+def test_summary_values_without_rows():
+    assert app.SUMMARY_VALUES['no_rows'] == ["nan hrs", "nan/10", "nan/10", "nan/100"]